@@ -5,25 +5,24 @@ This agent handles natural language commands for managing todo tasks
 and uses MCP tools to perform task operations.
 """
 
-import json
 import os
 import re
-from typing import List, Optional, Tuple
-from sqlmodel import Session
+import orjson
+from typing import AsyncIterator, List, Optional, Protocol, Sequence, Tuple
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from openai import OpenAI
-from ..mcp.tools import TOOL_DEFINITIONS, execute_tool
-from ..models import Message
-from ..config import get_settings
-
-settings = get_settings()
+from openai import AsyncOpenAI
+from ..mcp.tools import TOOL_DEFINITIONS, execute_tool, execute_tools
+from ..config import SETTINGS as settings
 
 # Initialize OpenAI client
-client = OpenAI(api_key=settings.openai_api_key)
+client = AsyncOpenAI(api_key=settings.openai_api_key)
 
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 MAX_CONTEXT_MESSAGES = 12
+MAX_CONTEXT_TURNS = 3
 MAX_TOOL_ITERATIONS = 4
+FAST_PATH_LIST_SIZE = 10
 
 # Shorter prompt reduces token count and latency.
 SYSTEM_PROMPT = """You manage todo tasks with tools.
@@ -31,18 +30,64 @@ Use tools for add/list/complete/delete/update actions.
 Be concise and friendly.
 If the user is ambiguous, ask a clarifying question.
 If a task is not found, say so clearly."""
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+
+class ChatMessage(Protocol):
+    """A conversation message: a Message model or a (role, content) row."""
+
+    role: str
+    content: str
+
+
+# Fast-path command patterns, compiled once at import.
+_ADD_RE = re.compile(r"^(?:add|create)\s+(?:a\s+)?task(?:\s+to)?\s+(.+)$", re.IGNORECASE)
+_REMEMBER_RE = re.compile(r"^remember\s+to\s+(.+)$", re.IGNORECASE)
+_COMPLETE_RE = re.compile(r"(?:complete|finish|mark)\s+task\s+(\d+)(?:\s+as\s+(?:done|complete))?")
+_DELETE_RE = re.compile(r"(?:delete|remove)\s+task\s+(\d+)")
+_UPDATE_RE = re.compile(r"(?:change|update|rename)\s+task\s+(\d+)\s+(?:to|as)\s+(.+)$", re.IGNORECASE)
+
+# Cheap gates so a message only runs the patterns whose verbs it contains.
+_ADD_PATTERNS = {"add": _ADD_RE, "create": _ADD_RE, "remember": _REMEMBER_RE}
+_COMPLETE_VERBS = frozenset({"complete", "finish", "mark"})
+_DELETE_VERBS = frozenset({"delete", "remove"})
+_UPDATE_VERBS = frozenset({"change", "update", "rename"})
+
+# List/show keywords. Multi-word phrases are matched with a single alternation
+# scan; single words are checked against one tokenization of the message.
+_STATUS_PHRASES = {
+    "what's pending": "pending",
+    "what is pending": "pending",
+    "pending tasks": "pending",
+    "completed tasks": "completed",
+    "done tasks": "completed",
+    "finished tasks": "completed",
+}
+_STATUS_PHRASE_RE = re.compile("|".join(re.escape(phrase) for phrase in _STATUS_PHRASES))
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TASK_WORDS = frozenset({"task", "tasks", "todo", "todos"})
+_LIST_WORDS = frozenset({"list", "show", "what", "display"})
+_COMPLETED_WORDS = frozenset({"completed", "done", "finished"})
+_LIST_COMMANDS = frozenset({"tasks", "todos", "show tasks", "list tasks"})
+
+
+def _recent_openai_messages(messages: Sequence[ChatMessage]) -> list[dict]:
+    """Trim history to the last few user turns to keep latency low."""
+    recent = messages[-MAX_CONTEXT_MESSAGES:]
 
+    # Start at the MAX_CONTEXT_TURNS-th most recent user message so the
+    # window never opens on an orphaned assistant reply.
+    user_turns = 0
+    for index in range(len(recent) - 1, -1, -1):
+        if recent[index].role == "user":
+            user_turns += 1
+            if user_turns == MAX_CONTEXT_TURNS:
+                recent = recent[index:]
+                break
 
-def _recent_openai_messages(messages: List[Message]) -> list[dict]:
-    """Trim history to recent messages to keep latency low."""
-    recent = messages[-MAX_CONTEXT_MESSAGES:]
-    return [{"role": "system", "content": SYSTEM_PROMPT}] + [
-        {
-            "role": msg.role,
-            "content": msg.content,
-        }
-        for msg in recent
-    ]
+    openai_messages = [_SYSTEM_MESSAGE]
+    openai_messages.extend({"role": msg.role, "content": msg.content} for msg in recent)
+    return openai_messages
 
 
 def _strip_wrapping_quotes(value: str) -> str:
@@ -52,10 +97,10 @@ def _strip_wrapping_quotes(value: str) -> str:
     return value
 
 
-def _fast_path_command(
+async def _fast_path_command(
     user_id: str,
-    messages: List[Message],
-    session: Session,
+    messages: Sequence[ChatMessage],
+    session: AsyncSession,
 ) -> Optional[Tuple[str, List[dict]]]:
     """Handle common explicit commands without an LLM round-trip."""
     latest_user = next((m for m in reversed(messages) if m.role == "user"), None)
@@ -67,8 +112,12 @@ def _fast_path_command(
         return None
     lower = text.lower().strip()
 
-    def run_tool(tool_name: str, arguments: dict, response_text: str | None = None):
-        result = execute_tool(
+    async def run_tool(
+        tool_name: str,
+        arguments: dict,
+        response_text: Optional[str] = None,
+    ) -> Tuple[str, List[dict]]:
+        result = await execute_tool(
             session=session,
             user_id=user_id,
             tool_name=tool_name,
@@ -78,16 +127,16 @@ def _fast_path_command(
             if tool_name == "add_task":
                 response_text = f"Added task: {result.get('title', arguments.get('title', 'Untitled'))}."
             elif tool_name == "list_tasks":
-                items = result if isinstance(result, list) else []
+                items = result.get("items", [])
                 if not items:
                     response_text = "You don't have any matching tasks yet."
                 else:
                     lines = [
                         f"{'Done' if item.get('completed') else 'Todo'} #{item.get('id')}: {item.get('title')}"
-                        for item in items[:10]
+                        for item in items
                     ]
-                    if len(items) > 10:
-                        lines.append(f"...and {len(items) - 10} more.")
+                    if result.get("next_cursor"):
+                        lines.append("...and more.")
                     response_text = "Here are your tasks:\n" + "\n".join(lines)
             elif tool_name == "complete_task":
                 response_text = (
@@ -113,147 +162,187 @@ def _fast_path_command(
         return response_text, [{"name": tool_name, "arguments": arguments, "result": result}]
 
     # add/create task
-    add_match = re.match(
-        r"^(?:add|create)\s+(?:a\s+)?task(?:\s+to)?\s+(.+)$",
-        text,
-        flags=re.IGNORECASE,
-    ) or re.match(r"^remember\s+to\s+(.+)$", text, flags=re.IGNORECASE)
+    add_pattern = _ADD_PATTERNS.get(lower.split(None, 1)[0])
+    add_match = add_pattern.match(text) if add_pattern else None
     if add_match:
         title = _strip_wrapping_quotes(add_match.group(1))
         if title:
-            return run_tool("add_task", {"title": title})
+            return await run_tool("add_task", {"title": title})
 
     # list/show tasks
-    if any(phrase in lower for phrase in ["what's pending", "what is pending", "pending tasks"]):
-        return run_tool("list_tasks", {"status": "pending"})
-    if any(phrase in lower for phrase in ["completed tasks", "done tasks", "finished tasks"]):
-        return run_tool("list_tasks", {"status": "completed"})
-    if (
-        ("task" in lower or "todo" in lower)
-        and any(word in lower for word in ["list", "show", "what", "display"])
-    ) or lower in {"tasks", "todos", "show tasks", "list tasks"}:
+    phrase_match = _STATUS_PHRASE_RE.search(lower)
+    if phrase_match:
+        status = _STATUS_PHRASES[phrase_match.group(0)]
+        return await run_tool("list_tasks", {"status": status, "limit": FAST_PATH_LIST_SIZE})
+    words = frozenset(_WORD_RE.findall(lower))
+    if (words & _TASK_WORDS and words & _LIST_WORDS) or lower in _LIST_COMMANDS:
         status = "all"
-        if "pending" in lower:
+        if "pending" in words:
             status = "pending"
-        elif any(word in lower for word in ["completed", "done", "finished"]):
+        elif words & _COMPLETED_WORDS:
             status = "completed"
-        return run_tool("list_tasks", {"status": status})
+        return await run_tool("list_tasks", {"status": status, "limit": FAST_PATH_LIST_SIZE})
 
     # complete task by id
-    complete_match = re.search(
-        r"(?:complete|finish|mark)\s+task\s+(\d+)(?:\s+as\s+(?:done|complete))?",
-        lower,
-    )
+    complete_match = _COMPLETE_RE.search(lower) if words & _COMPLETE_VERBS else None
     if complete_match:
-        return run_tool("complete_task", {"task_id": int(complete_match.group(1))})
+        return await run_tool("complete_task", {"task_id": int(complete_match.group(1))})
 
     # delete/remove task by id
-    delete_match = re.search(r"(?:delete|remove)\s+task\s+(\d+)", lower)
+    delete_match = _DELETE_RE.search(lower) if words & _DELETE_VERBS else None
     if delete_match:
-        return run_tool("delete_task", {"task_id": int(delete_match.group(1))})
+        return await run_tool("delete_task", {"task_id": int(delete_match.group(1))})
 
     # update task by id
-    update_match = re.search(
-        r"(?:change|update|rename)\s+task\s+(\d+)\s+(?:to|as)\s+(.+)$",
-        text,
-        flags=re.IGNORECASE,
-    )
+    update_match = _UPDATE_RE.search(text) if words & _UPDATE_VERBS else None
     if update_match:
         task_id = int(update_match.group(1))
         title = _strip_wrapping_quotes(update_match.group(2))
         if title:
-            return run_tool("update_task", {"task_id": task_id, "title": title})
+            return await run_tool("update_task", {"task_id": task_id, "title": title})
 
     return None
 
 
-async def run_agent(
+async def stream_agent(
     user_id: str,
-    messages: List[Message],
-    session: Session,
-) -> Tuple[str, List[dict]]:
+    messages: Sequence[ChatMessage],
+    session: AsyncSession,
+) -> AsyncIterator[dict]:
     """
-    Run the AI agent with the given conversation history.
+    Run the AI agent and yield events as the response is generated.
 
     Args:
         user_id: The user's ID
         messages: List of conversation messages
         session: Database session for tool execution
 
-    Returns:
-        Tuple of (agent response, list of tool calls made)
+    Yields:
+        {"type": "delta", "content": str} for each chunk of response text and
+        {"type": "tool_call", "tool_call": dict} for each tool call made
     """
-    fast_path = _fast_path_command(user_id=user_id, messages=messages, session=session)
+    fast_path = await _fast_path_command(user_id=user_id, messages=messages, session=session)
     if fast_path:
-        return fast_path
+        response_text, tool_calls = fast_path
+        for tool_call in tool_calls:
+            yield {"type": "tool_call", "tool_call": tool_call}
+        yield {"type": "delta", "content": response_text}
+        return
 
     # Convert messages to OpenAI format (trimmed for latency)
     openai_messages = _recent_openai_messages(messages)
 
-    tool_calls_made = []
-
     for _ in range(MAX_TOOL_ITERATIONS):
-        # Call OpenAI API with tools
-        response = client.chat.completions.create(
+        # Call OpenAI API with tools, streaming text as it arrives
+        stream = await client.chat.completions.create(
             model=OPENAI_MODEL,
             messages=openai_messages,
             tools=TOOL_DEFINITIONS,
             tool_choice="auto",
             max_tokens=220,
+            stream=True,
         )
 
-        assistant_message = response.choices[0].message
-
-        # If no tool calls, return the response
-        if not assistant_message.tool_calls:
-            return assistant_message.content or "I'm not sure how to help with that.", tool_calls_made
+        content_parts: List[str] = []
+        pending_calls: dict[int, dict] = {}
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+
+            if delta.content:
+                content_parts.append(delta.content)
+                yield {"type": "delta", "content": delta.content}
+
+            # Tool calls arrive in fragments keyed by index
+            for tc in delta.tool_calls or []:
+                call = pending_calls.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function and tc.function.name:
+                    call["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    call["arguments"] += tc.function.arguments
+
+        # If no tool calls, the response is complete
+        if not pending_calls:
+            if not content_parts:
+                yield {"type": "delta", "content": "I'm not sure how to help with that."}
+            return
 
         # Process tool calls
+        calls = [pending_calls[index] for index in sorted(pending_calls)]
         openai_messages.append({
             "role": "assistant",
-            "content": assistant_message.content,
+            "content": "".join(content_parts) or None,
             "tool_calls": [
                 {
-                    "id": tc.id,
+                    "id": call["id"],
                     "type": "function",
                     "function": {
-                        "name": tc.function.name,
-                        "arguments": tc.function.arguments,
+                        "name": call["name"],
+                        "arguments": call["arguments"],
                     },
                 }
-                for tc in assistant_message.tool_calls
+                for call in calls
             ],
         })
 
-        # Execute each tool call
-        for tool_call in assistant_message.tool_calls:
-            tool_name = tool_call.function.name
+        # Execute the turn's tool calls as one batch
+        for call in calls:
             try:
-                arguments = json.loads(tool_call.function.arguments)
-            except json.JSONDecodeError:
-                arguments = {}
-
-            # Execute the tool
-            result = execute_tool(
-                session=session,
-                user_id=user_id,
-                tool_name=tool_name,
-                arguments=arguments,
-            )
-
-            # Track tool calls
-            tool_calls_made.append({
-                "name": tool_name,
-                "arguments": arguments,
-                "result": result,
-            })
+                call["arguments"] = orjson.loads(call["arguments"])
+            except orjson.JSONDecodeError:
+                call["arguments"] = {}
+
+        results = await execute_tools(session=session, user_id=user_id, calls=calls)
+
+        for call, result in zip(calls, results):
+            yield {
+                "type": "tool_call",
+                "tool_call": {
+                    "name": call["name"],
+                    "arguments": call["arguments"],
+                    "result": result,
+                },
+            }
 
             # Add tool result to messages
             openai_messages.append({
                 "role": "tool",
-                "tool_call_id": tool_call.id,
-                "content": json.dumps(result),
+                "tool_call_id": call["id"],
+                "content": orjson.dumps(result).decode(),
             })
 
     # If we hit max iterations, return what we have
-    return "I've completed the requested operations. Is there anything else you'd like me to do?", tool_calls_made
+    yield {
+        "type": "delta",
+        "content": "I've completed the requested operations. Is there anything else you'd like me to do?",
+    }
+
+
+async def run_agent(
+    user_id: str,
+    messages: Sequence[ChatMessage],
+    session: AsyncSession,
+) -> Tuple[str, List[dict]]:
+    """
+    Run the AI agent with the given conversation history.
+
+    Args:
+        user_id: The user's ID
+        messages: List of conversation messages
+        session: Database session for tool execution
+
+    Returns:
+        Tuple of (agent response, list of tool calls made)
+    """
+    response_parts: List[str] = []
+    tool_calls_made: List[dict] = []
+    async for event in stream_agent(user_id=user_id, messages=messages, session=session):
+        if event["type"] == "delta":
+            response_parts.append(event["content"])
+        else:
+            tool_calls_made.append(event["tool_call"])
+
+    return "".join(response_parts), tool_calls_made
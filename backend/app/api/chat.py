@@ -1,12 +1,17 @@
+import asyncio
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Any, Optional, List
-from sqlmodel import Session, select
-from datetime import datetime
+from typing import Any, Optional, List, Tuple
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session
+from ..database import create_session, get_session
 from ..auth import get_current_user_id
 from ..models import Conversation, Message
+from ..models.timestamps import db_now
+from ..agent.todo_agent import MAX_CONTEXT_MESSAGES, ChatMessage, run_agent, stream_agent
 
 router = APIRouter()
 
@@ -31,37 +36,50 @@ class ChatResponse(BaseModel):
     tool_calls: List[ToolCall] = Field(default_factory=list)
 
 
-@router.post("/{user_id}/chat", response_model=ChatResponse)
-async def chat(
+async def _recent_history(conversation_id: int) -> List[ChatMessage]:
+    """Load the tail of a conversation's history on a session of its own."""
+    async with create_session() as session:
+        # The agent only uses the tail, and only role/content are needed,
+        # so skip building Message objects.
+        recent = (await session.exec(
+            select(Message.role, Message.content)
+            .where(Message.conversation_id == conversation_id)
+            # Messages staged in one transaction share now(), so break ties by id
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(MAX_CONTEXT_MESSAGES - 1)
+        )).all()
+    return list(reversed(recent))
+
+
+async def _start_turn(
+    session: AsyncSession,
     user_id: str,
     request: ChatRequest,
-    session: Session = Depends(get_session),
-    auth_user_id: str = Depends(get_current_user_id),
-):
+) -> Tuple[int, List[ChatMessage]]:
     """
-    Send a message to the AI chatbot and get a response.
+    Load or create the conversation and stage the user's message.
 
-    The chatbot understands natural language commands for managing todos:
-    - "Add a task to buy groceries"
-    - "Show me all my tasks"
-    - "Mark task 3 as complete"
-    - "Delete the meeting task"
-    """
-    # Verify user authorization
-    if user_id != auth_user_id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this user's chat")
+    Nothing is committed here; the caller commits once the assistant
+    response has been added.
 
-    # Get or create conversation
+    Returns:
+        Tuple of (conversation ID, recent messages ending with the new one)
+    """
+    history: List[ChatMessage] = []
     if request.conversation_id:
-        conversation = session.get(Conversation, request.conversation_id)
+        # Fetch history alongside the conversation on a second connection;
+        # it is discarded below if the conversation isn't the user's.
+        conversation, history = await asyncio.gather(
+            session.get(Conversation, request.conversation_id),
+            _recent_history(request.conversation_id),
+        )
         if not conversation or conversation.user_id != user_id:
             raise HTTPException(status_code=404, detail="Conversation not found")
-        conversation.updated_at = datetime.utcnow()
+        conversation.updated_at = db_now()
     else:
         conversation = Conversation(user_id=user_id)
         session.add(conversation)
-        session.commit()
-        session.refresh(conversation)
+        await session.flush()
 
     # Store user message
     user_message = Message(
@@ -71,36 +89,117 @@ async def chat(
         content=request.message,
     )
     session.add(user_message)
-    session.commit()
 
-    # Get conversation history
-    messages = session.exec(
-        select(Message)
-        .where(Message.conversation_id == conversation.id)
-        .order_by(Message.created_at)
-    ).all()
+    return conversation.id, history + [user_message]
+
+
+def _add_assistant_message(
+    session: AsyncSession,
+    user_id: str,
+    conversation_id: int,
+    content: str,
+) -> None:
+    """Stage the assistant's response for the turn's commit."""
+    session.add(Message(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        role="assistant",
+        content=content,
+    ))
+
+
+def _sse(event: dict) -> bytes:
+    """Format one Server-Sent Events message."""
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+@router.post("/{user_id}/chat", response_model=ChatResponse)
+async def chat(
+    user_id: str,
+    request: ChatRequest,
+    session: AsyncSession = Depends(get_session),
+    auth_user_id: str = Depends(get_current_user_id),
+):
+    """
+    Send a message to the AI chatbot and get a response.
+
+    The chatbot understands natural language commands for managing todos:
+    - "Add a task to buy groceries"
+    - "Show me all my tasks"
+    - "Mark task 3 as complete"
+    - "Delete the meeting task"
+    """
+    # Verify user authorization
+    if user_id != auth_user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this user's chat")
 
-    # Run agent with MCP tools (to be implemented)
-    from ..agent.todo_agent import run_agent
+    conversation_id, messages = await _start_turn(session, user_id, request)
 
+    # Run agent with MCP tools
     agent_response, tool_calls = await run_agent(
         user_id=user_id,
         messages=messages,
         session=session,
     )
 
-    # Store assistant response
-    assistant_message = Message(
-        user_id=user_id,
-        conversation_id=conversation.id,
-        role="assistant",
-        content=agent_response,
-    )
-    session.add(assistant_message)
-    session.commit()
+    # Store assistant response and commit the whole turn
+    _add_assistant_message(session, user_id, conversation_id, agent_response)
+    await session.commit()
 
     return ChatResponse(
-        conversation_id=conversation.id,
+        conversation_id=conversation_id,
         response=agent_response,
         tool_calls=tool_calls,
     )
+
+
+@router.post("/{user_id}/chat/stream")
+async def chat_stream(
+    user_id: str,
+    request: ChatRequest,
+    auth_user_id: str = Depends(get_current_user_id),
+):
+    """
+    Send a message to the AI chatbot and stream the response as Server-Sent Events.
+
+    Emits "delta" events with chunks of response text and "tool_call" events
+    as tools run, followed by a "done" event carrying the same fields as the
+    /chat response.
+    """
+    # Verify user authorization
+    if user_id != auth_user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this user's chat")
+
+    # The session must outlive this handler, so it is closed by the stream.
+    session = create_session()
+    try:
+        conversation_id, messages = await _start_turn(session, user_id, request)
+    except BaseException:
+        await session.close()
+        raise
+
+    async def event_stream():
+        try:
+            response_parts = []
+            tool_calls = []
+            async for event in stream_agent(user_id=user_id, messages=messages, session=session):
+                if event["type"] == "delta":
+                    response_parts.append(event["content"])
+                else:
+                    tool_calls.append(event["tool_call"])
+                yield _sse(event)
+
+            agent_response = "".join(response_parts)
+            _add_assistant_message(session, user_id, conversation_id, agent_response)
+            await session.commit()
+
+            done = ChatResponse(
+                conversation_id=conversation_id,
+                response=agent_response,
+                tool_calls=tool_calls,
+            )
+            yield _sse({"type": "done", **done.model_dump(mode="json")})
+        finally:
+            await session.close()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
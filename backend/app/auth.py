@@ -1,42 +1,58 @@
-from fastapi import HTTPException, Depends, status
+import hashlib
+from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import httpx
+from cachetools import TTLCache
 from jose import jwt, JWTError
-from .config import get_settings
+from .config import SETTINGS as settings
 
-settings = get_settings()
 security = HTTPBearer()
 
+# Validated opaque sessions, keyed by a digest of the token.
+_SESSION_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
 
 async def verify_token(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> dict:
     """Verify bearer token and return auth payload."""
     token = credentials.credentials
 
     # Support JWT tokens if the auth server is configured to issue them.
-    try:
-        payload = jwt.decode(
-            token,
-            settings.better_auth_secret,
-            algorithms=["HS256"],
-        )
-        return payload
-    except JWTError:
-        pass
+    # Only tokens shaped like a JWT (header.payload.signature) are decoded,
+    # so opaque tokens skip the decode attempt entirely.
+    if token.count(".") == 2:
+        try:
+            payload = jwt.decode(
+                token,
+                settings.better_auth_secret,
+                algorithms=["HS256"],
+            )
+            return payload
+        except JWTError:
+            pass
 
     # Default Better Auth sessions use opaque tokens, not JWTs.
     # Validate them via the auth server using the bearer plugin.
+    cache_key = _token_key(token)
+    cached = _SESSION_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
     auth_url = settings.better_auth_url.rstrip("/") + "/api/auth/get-session"
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                auth_url,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Accept": "application/json",
-                },
-            )
+        response = await request.app.state.http.get(
+            auth_url,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/json",
+            },
+        )
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,6 +61,7 @@ async def verify_token(
         )
 
     if response.status_code != 200:
+        _SESSION_CACHE.pop(cache_key, None)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token validation failed",
@@ -74,7 +91,9 @@ async def verify_token(
         )
 
     # Normalize to the shape expected by get_current_user_id().
-    return {"id": str(user_id), "user": user, "session": session}
+    payload = {"id": str(user_id), "user": user, "session": session}
+    _SESSION_CACHE[cache_key] = payload
+    return payload
 
 
 async def get_current_user_id(token_data: dict = Depends(verify_token)) -> str:
@@ -1,23 +1,48 @@
-from sqlmodel import SQLModel, create_engine, Session
-from .config import get_settings
-
-settings = get_settings()
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .config import SETTINGS as settings
+from .db_url import async_connect_args, async_database_url
 
 # Create database engine
-engine = create_engine(
-    settings.database_url,
+database_url = async_database_url(settings.database_url)
+engine = create_async_engine(
+    database_url,
+    connect_args=async_connect_args(database_url),
+    query_cache_size=1200,
     echo=False,
+    pool_size=20,
+    max_overflow=40,
     pool_pre_ping=True,
     pool_recycle=300,
 )
 
+# Sessions keep loaded attributes after commit so results can be built from
+# them without a reload SELECT.
+async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _create_tables_and_indexes(connection):
+    SQLModel.metadata.create_all(connection)
+    # create_all skips existing tables along with any indexes added to them
+    # later, so create missing indexes explicitly.
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+async def create_db_and_tables():
+    """Create all database tables and indexes."""
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_tables_and_indexes)
+
 
-def create_db_and_tables():
-    """Create all database tables."""
-    SQLModel.metadata.create_all(engine)
+def create_session() -> AsyncSession:
+    """Create a database session managed by the caller."""
+    return async_session()
 
 
-def get_session():
+async def get_session():
     """Get a database session."""
-    with Session(engine) as session:
+    async with create_session() as session:
         yield session
@@ -0,0 +1,42 @@
+from sqlalchemy.engine import URL, make_url
+
+# Sync drivers mapped to their async counterparts.
+_ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(database_url: str) -> URL:
+    """Rewrite a sync database URL to use an async driver."""
+    url = make_url(database_url)
+    drivername = _ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    url = url.set(drivername=drivername)
+
+    if drivername == "postgresql+asyncpg":
+        # asyncpg takes "ssl" instead of libpq's "sslmode" and has no
+        # channel_binding option.
+        query = dict(url.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+        url = url.set(query=query)
+
+    return url
+
+
+def async_connect_args(url: URL) -> dict:
+    """Driver connect arguments for an async database URL."""
+    if url.drivername == "postgresql+asyncpg":
+        return {
+            # The tools run a small fixed set of statements, so keep them
+            # prepared per connection instead of re-parsing on every call.
+            "prepared_statement_cache_size": 500,
+            "statement_cache_size": 500,
+            # Timestamps default to now(); in UTC it also stores UTC in
+            # tables whose columns predate timestamptz.
+            "server_settings": {"timezone": "UTC"},
+        }
+    return {}
@@ -1,22 +1,26 @@
 from contextlib import asynccontextmanager
+import httpx
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from .config import get_settings
+from .config import SETTINGS as settings
 from .database import create_db_and_tables
 from .api.chat import router as chat_router
 
 
-settings = get_settings()
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler for startup and shutdown events."""
-    # Startup: Create database tables
-    create_db_and_tables()
+    # Startup: Create database tables and a shared HTTP client for auth checks
+    await create_db_and_tables()
+    app.state.http = httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
     yield
-    # Shutdown: Cleanup if needed
+    # Shutdown: Close pooled connections
+    await app.state.http.aclose()
 
 
 app = FastAPI(
@@ -24,6 +28,7 @@ app = FastAPI(
     description="AI-powered chatbot for managing todos through natural language",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -6,14 +6,46 @@ to manage tasks through natural language commands.
 
 import json
 from datetime import datetime
-from typing import Optional, Literal
-from sqlmodel import Session, select
+from typing import List, Optional, Literal
+from cachetools import TTLCache
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import lambda_stmt
+from sqlmodel import and_, delete, func, insert, or_, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..models import Task
 
+DEFAULT_LIST_LIMIT = 50
+MAX_LIST_LIMIT = 200
 
-def add_task(
-    session: Session,
+# Statements below are built with lambda_stmt: SQLAlchemy caches each lambda
+# by its code location, so the statement is constructed and compiled once and
+# the closure variables (ids, values) are bound per call. Values must be
+# computed outside the lambdas so they are tracked as bound parameters.
+
+# Tools write through the session without committing; execute_tools commits
+# once per batch so a multi-call turn costs a single transaction.
+
+# list_tasks status filters, built once at import.
+_STATUS_WHERE = {
+    "pending": Task.completed.is_(False),
+    "completed": Task.completed.is_(True),
+}
+
+# Short-lived list_tasks results per user, keyed inside by the listing arguments.
+# A write drops the user's entry as it is made, so later listings in the same
+# transaction see it, and execute_tools drops it again once the write commits
+# or rolls back, so listings cached before then are not served afterwards. The
+# TTL only bounds staleness across workers.
+_TASK_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=2.0)
+
+
+def _invalidate_task_cache(user_id: str) -> None:
+    _TASK_CACHE.pop(user_id, None)
+
+
+async def add_task(
+    session: AsyncSession,
     user_id: str,
     title: str,
     description: Optional[str] = None,
@@ -36,8 +68,9 @@ def add_task(
         description=description,
     )
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    # The INSERT returns the new id, so no refresh is needed for the result
+    await session.flush()
+    _invalidate_task_cache(user_id)
 
     return {
         "task_id": task.id,
@@ -46,46 +79,128 @@ def add_task(
     }
 
 
-def list_tasks(
-    session: Session,
+async def add_tasks(
+    session: AsyncSession,
     user_id: str,
-    status: Literal["all", "pending", "completed"] = "all",
-) -> list:
+    tasks: List[dict],
+) -> dict:
     """
-    Retrieve tasks from the list.
+    Create several tasks with a single INSERT.
 
     Args:
         session: Database session
         user_id: The user's ID
-        status: Filter by status ("all", "pending", "completed")
+        tasks: List of dicts with a title and optional description
 
     Returns:
-        List of task objects
+        Dict with status and the created tasks' task_id and title
     """
-    query = select(Task).where(Task.user_id == user_id)
-
-    if status == "pending":
-        query = query.where(Task.completed == False)
-    elif status == "completed":
-        query = query.where(Task.completed == True)
-
-    query = query.order_by(Task.created_at.desc())
-    tasks = session.exec(query).all()
-
-    return [
+    rows = [
         {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "completed": task.completed,
-            "created_at": task.created_at.isoformat(),
+            "user_id": user_id,
+            "title": item["title"],
+            "description": item.get("description"),
         }
-        for task in tasks
+        for item in tasks
     ]
+    if not rows:
+        return {"status": "created", "tasks": []}
+
+    created = (await session.execute(
+        insert(Task).returning(Task.id, Task.title, sort_by_parameter_order=True),
+        rows,
+    )).all()
+    _invalidate_task_cache(user_id)
+
+    return {
+        "status": "created",
+        "tasks": [{"task_id": task_id, "title": title} for task_id, title in created],
+    }
+
+
+async def list_tasks(
+    session: AsyncSession,
+    user_id: str,
+    status: Literal["all", "pending", "completed"] = "all",
+    limit: int = DEFAULT_LIST_LIMIT,
+    cursor: Optional[str] = None,
+    verbose: bool = False,
+) -> dict:
+    """
+    Retrieve tasks from the list, newest first.
 
+    Args:
+        session: Database session
+        user_id: The user's ID
+        status: Filter by status ("all", "pending", "completed")
+        limit: Maximum number of tasks to return
+        cursor: next_cursor from a previous call, to fetch the following page
+        verbose: Include each task's description
 
-def complete_task(
-    session: Session,
+    Returns:
+        Dict with items (list of task objects) and next_cursor, which is
+        None when there are no more tasks
+    """
+    limit = max(1, min(limit, MAX_LIST_LIMIT))
+    user_cache = _TASK_CACHE.setdefault(user_id, {})
+    cache_key = (status, limit, cursor, verbose)
+    cached = user_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Select plain columns rather than Task objects to skip ORM hydration.
+    # Descriptions can be long, so they are only fetched when asked for.
+    if verbose:
+        query = lambda_stmt(lambda: select(
+            Task.id,
+            Task.title,
+            Task.description,
+            Task.completed,
+            Task.created_at,
+        ).where(Task.user_id == user_id))
+    else:
+        query = lambda_stmt(lambda: select(
+            Task.id,
+            Task.title,
+            Task.completed,
+            Task.created_at,
+        ).where(Task.user_id == user_id))
+
+    if (status_clause := _STATUS_WHERE.get(status)) is not None:
+        query += lambda q: q.where(status_clause)
+
+    # Keyset pagination: continue strictly after the cursor's (created_at, id)
+    if cursor:
+        try:
+            after_created, _, after_id = cursor.rpartition("|")
+            after_created_at = datetime.fromisoformat(after_created)
+            after_task_id = int(after_id)
+        except ValueError:
+            return {"error": "Invalid cursor"}
+        query += lambda q: q.where(or_(
+            Task.created_at < after_created_at,
+            and_(Task.created_at == after_created_at, Task.id < after_task_id),
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    fetch_limit = limit + 1
+    query += lambda q: q.order_by(Task.created_at.desc(), Task.id.desc()).limit(fetch_limit)
+    rows = (await session.execute(query)).mappings().all()
+
+    # created_at stays a datetime; responses are encoded with orjson, which
+    # serializes it natively.
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = f"{items[-1]['created_at'].isoformat()}|{items[-1]['id']}"
+
+    result = {"items": items, "next_cursor": next_cursor}
+    user_cache[cache_key] = result
+    return result
+
+
+async def complete_task(
+    session: AsyncSession,
     user_id: str,
     task_id: int,
 ) -> dict:
@@ -100,31 +215,31 @@ def complete_task(
     Returns:
         Dict with task_id, status, and title
     """
-    task = session.exec(
-        select(Task).where(Task.id == task_id, Task.user_id == user_id)
-    ).first()
-
-    if not task:
+    row = (await session.execute(lambda_stmt(
+        lambda: update(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .values(completed=True)
+        .returning(Task.title)
+    ))).first()
+
+    if row is None:
         return {
             "task_id": task_id,
             "status": "error",
             "error": "Task not found",
         }
 
-    task.completed = True
-    task.updated_at = datetime.utcnow()
-    session.add(task)
-    session.commit()
+    _invalidate_task_cache(user_id)
 
     return {
-        "task_id": task.id,
+        "task_id": task_id,
         "status": "completed",
-        "title": task.title,
+        "title": row.title,
     }
 
 
-def delete_task(
-    session: Session,
+async def delete_task(
+    session: AsyncSession,
     user_id: str,
     task_id: int,
 ) -> dict:
@@ -139,30 +254,30 @@ def delete_task(
     Returns:
         Dict with task_id, status, and title
     """
-    task = session.exec(
-        select(Task).where(Task.id == task_id, Task.user_id == user_id)
-    ).first()
+    row = (await session.execute(lambda_stmt(
+        lambda: delete(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .returning(Task.title)
+    ))).first()
 
-    if not task:
+    if row is None:
         return {
             "task_id": task_id,
             "status": "error",
             "error": "Task not found",
         }
 
-    title = task.title
-    session.delete(task)
-    session.commit()
+    _invalidate_task_cache(user_id)
 
     return {
         "task_id": task_id,
         "status": "deleted",
-        "title": title,
+        "title": row.title,
     }
 
 
-def update_task(
-    session: Session,
+async def update_task(
+    session: AsyncSession,
     user_id: str,
     task_id: int,
     title: Optional[str] = None,
@@ -179,37 +294,48 @@ def update_task(
         description: New description (optional)
 
     Returns:
-        Dict with task_id, status, and title
+        Dict with task_id, status, and title; status is "noop" (and no
+        title is returned) when neither field is given
     """
-    task = session.exec(
-        select(Task).where(Task.id == task_id, Task.user_id == user_id)
-    ).first()
-
-    if not task:
+    # Nothing to change, so skip the write entirely
+    if title is None and description is None:
+        return {"task_id": task_id, "status": "noop"}
+
+    # COALESCE keeps the statement shape identical whichever fields are given,
+    # so a single cached statement covers every update.
+    row = (await session.execute(lambda_stmt(
+        lambda: update(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .values(
+            title=func.coalesce(title, Task.title),
+            description=func.coalesce(description, Task.description),
+        )
+        .returning(Task.title)
+    ))).first()
+
+    if row is None:
         return {
             "task_id": task_id,
             "status": "error",
             "error": "Task not found",
         }
 
-    if title is not None:
-        task.title = title
-    if description is not None:
-        task.description = description
-
-    task.updated_at = datetime.utcnow()
-    session.add(task)
-    session.commit()
+    _invalidate_task_cache(user_id)
 
     return {
-        "task_id": task.id,
+        "task_id": task_id,
         "status": "updated",
-        "title": task.title,
+        "title": row.title,
     }
 
 
-# Tool definitions for the agent
-TOOL_DEFINITIONS = [
+# Tool definitions for the agent.
+#
+# OpenAI prompt caching only applies when the request prefix (tools, then
+# the system prompt) is byte-identical between calls. Keep this a constant
+# built once at import: no per-request or per-user values, and no
+# reordering at runtime. It is a tuple so it cannot be mutated in place.
+TOOL_DEFINITIONS = (
     {
         "type": "function",
         "function": {
@@ -231,6 +357,36 @@ TOOL_DEFINITIONS = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "add_tasks",
+            "description": "Create several tasks at once. Use this instead of repeated add_task calls when the user lists multiple things to add.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tasks": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": {
+                                    "type": "string",
+                                    "description": "The title of the task",
+                                },
+                                "description": {
+                                    "type": "string",
+                                    "description": "Optional detailed description of the task",
+                                },
+                            },
+                            "required": ["title"],
+                        },
+                    },
+                },
+                "required": ["tasks"],
+            },
+        },
+    },
     {
         "type": "function",
         "function": {
@@ -244,6 +400,20 @@ TOOL_DEFINITIONS = [
                         "enum": ["all", "pending", "completed"],
                         "description": "Filter tasks by status. 'all' shows all tasks, 'pending' shows incomplete tasks, 'completed' shows finished tasks.",
                     },
+                    "limit": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": MAX_LIST_LIMIT,
+                        "description": f"Maximum number of tasks to return, newest first. Defaults to {DEFAULT_LIST_LIMIT}.",
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "The next_cursor value from a previous list_tasks result, to get the next page.",
+                    },
+                    "verbose": {
+                        "type": "boolean",
+                        "description": "Include each task's description. Only set this when the user asks for task details.",
+                    },
                 },
                 "required": [],
             },
@@ -308,26 +478,123 @@ TOOL_DEFINITIONS = [
             },
         },
     },
-]
+)
+
+
+class AddTaskArgs(BaseModel):
+    """Arguments for add_task."""
+    title: str
+    description: Optional[str] = None
+
+
+class AddTasksArgs(BaseModel):
+    """Arguments for add_tasks."""
+    tasks: List[AddTaskArgs]
+
+
+class ListTasksArgs(BaseModel):
+    """Arguments for list_tasks."""
+    status: Literal["all", "pending", "completed"] = "all"
+    limit: int = DEFAULT_LIST_LIMIT
+    cursor: Optional[str] = None
+    verbose: bool = False
+
+
+class TaskIdArgs(BaseModel):
+    """Arguments for complete_task and delete_task."""
+    task_id: int
 
 
-def execute_tool(
-    session: Session,
+class UpdateTaskArgs(BaseModel):
+    """Arguments for update_task."""
+    task_id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+
+# Tool name -> (function, argument model). Arguments come from the model, so
+# they are validated and coerced before reaching the database.
+_TOOLS = {
+    "add_task": (add_task, AddTaskArgs),
+    "add_tasks": (add_tasks, AddTasksArgs),
+    "list_tasks": (list_tasks, ListTasksArgs),
+    "complete_task": (complete_task, TaskIdArgs),
+    "delete_task": (delete_task, TaskIdArgs),
+    "update_task": (update_task, UpdateTaskArgs),
+}
+
+
+def _validation_error(tool_name: str, exc: ValidationError) -> dict:
+    details = "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'arguments'}: {error['msg']}"
+        for error in exc.errors()
+    )
+    return {"error": f"Invalid arguments for {tool_name}: {details}"}
+
+
+async def execute_tools(
+    session: AsyncSession,
+    user_id: str,
+    calls: List[dict],
+) -> List[dict]:
+    """
+    Execute several tool calls in one transaction.
+
+    Args:
+        session: Database session
+        user_id: The user's ID
+        calls: List of dicts with a tool name and its arguments
+
+    Returns:
+        List of tool results, in the order of calls
+    """
+    results = []
+    wrote = False
+    try:
+        for call in calls:
+            tool_name = call["name"]
+            if tool_name not in _TOOLS:
+                results.append({"error": f"Unknown tool: {tool_name}"})
+                continue
+
+            tool, args_model = _TOOLS[tool_name]
+            try:
+                args = args_model.model_validate(call["arguments"])
+            except ValidationError as exc:
+                results.append(_validation_error(tool_name, exc))
+                continue
+
+            wrote = wrote or tool_name != "list_tasks"
+            # Add session and user_id to arguments
+            results.append(await tool(
+                session=session,
+                user_id=user_id,
+                **args.model_dump(exclude_none=True),
+            ))
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        # Results listed mid-batch may include the rolled back writes
+        _invalidate_task_cache(user_id)
+        raise
+
+    if wrote:
+        # Listings cached by any request before the commit are now stale
+        _invalidate_task_cache(user_id)
+
+    return results
+
+
+async def execute_tool(
+    session: AsyncSession,
     user_id: str,
     tool_name: str,
     arguments: dict,
 ) -> dict:
     """Execute a tool by name with the given arguments."""
-    tools = {
-        "add_task": add_task,
-        "list_tasks": list_tasks,
-        "complete_task": complete_task,
-        "delete_task": delete_task,
-        "update_task": update_task,
-    }
-
-    if tool_name not in tools:
-        return {"error": f"Unknown tool: {tool_name}"}
-
-    # Add session and user_id to arguments
-    return tools[tool_name](session=session, user_id=user_id, **arguments)
+    results = await execute_tools(
+        session=session,
+        user_id=user_id,
+        calls=[{"name": tool_name, "arguments": arguments}],
+    )
+    return results[0]
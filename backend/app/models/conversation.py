@@ -2,6 +2,8 @@ from datetime import datetime
 from typing import Optional
 from sqlmodel import SQLModel, Field
 
+from .timestamps import created_at_column, updated_at_column
+
 
 class Conversation(SQLModel, table=True):
     """Conversation model for storing chat sessions."""
@@ -10,5 +12,5 @@ class Conversation(SQLModel, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(sa_column=created_at_column())
+    updated_at: datetime = Field(sa_column=updated_at_column())
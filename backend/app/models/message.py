@@ -1,16 +1,49 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import CHAR, Column, Index
+from sqlalchemy.types import TypeDecorator
 from sqlmodel import SQLModel, Field
 
+from .timestamps import created_at_column
+
+_ROLE_CODES = {"user": "u", "assistant": "a", "system": "s"}
+_ROLE_NAMES = {code: role for role, code in _ROLE_CODES.items()}
+
+
+class MessageRole(TypeDecorator):
+    """Store a message role as a one-letter code.
+
+    Rows written before the column was narrowed hold the full role name,
+    so unknown values are passed through unchanged when read.
+    """
+
+    impl = CHAR(1)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return _ROLE_CODES[value]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return _ROLE_NAMES.get(value, value)
+
 
 class Message(SQLModel, table=True):
     """Message model for storing chat messages."""
 
     __tablename__ = "messages"
+    # Serves history replay in created_at order and, via its leading column,
+    # plain conversation_id lookups.
+    __table_args__ = (
+        Index("ix_messages_conv_created", "conversation_id", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: str = Field(index=True)
-    conversation_id: int = Field(foreign_key="conversations.id", index=True)
-    role: str  # "user" or "assistant"
+    user_id: str
+    conversation_id: int = Field(foreign_key="conversations.id")
+    role: str = Field(sa_column=Column(MessageRole(), nullable=False))  # "user" or "assistant"
     content: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(sa_column=created_at_column())
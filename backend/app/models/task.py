@@ -1,17 +1,26 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field
 
+from .timestamps import created_at_column, updated_at_column
+
 
 class Task(SQLModel, table=True):
     """Task model for storing todo items."""
 
     __tablename__ = "tasks"
+    # Match list_tasks' ORDER BY created_at DESC, with and without a status
+    # filter, so listings are read in index order without a sort.
+    __table_args__ = (
+        Index("ix_tasks_user_created", "user_id", text("created_at DESC")),
+        Index("ix_tasks_user_completed_created", "user_id", "completed", text("created_at DESC")),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: str = Field(index=True)
+    user_id: str
     title: str
     description: Optional[str] = None
     completed: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(sa_column=created_at_column())
+    updated_at: datetime = Field(sa_column=updated_at_column())
@@ -0,0 +1,54 @@
+from sqlalchemy import Column, DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+
+class db_now(FunctionElement):
+    """The database's current timestamp."""
+
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(db_now)
+def _db_now_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(db_now, "postgresql")
+def _db_now_postgresql(element, compiler, **kw):
+    return "now()"
+
+
+@compiles(db_now, "sqlite")
+def _db_now_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP has one-second precision and a different text format
+    # from the datetimes SQLAlchemy binds. SQLite compares them as strings, so
+    # match SQLAlchemy's storage format (microseconds included).
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+def created_at_column() -> Column:
+    """Timestamp column set by the database when a row is inserted.
+
+    The default is rendered into each INSERT as well as declared on the
+    table, so tables created before the server default existed still get
+    a value.
+    """
+    return Column(
+        DateTime(timezone=True),
+        default=db_now(),
+        server_default=db_now(),
+        nullable=False,
+    )
+
+
+def updated_at_column() -> Column:
+    """Timestamp column set by the database on insert and on every update."""
+    return Column(
+        DateTime(timezone=True),
+        default=db_now(),
+        server_default=db_now(),
+        onupdate=db_now(),
+        nullable=False,
+    )